@@ -1,6 +1,18 @@
 import argparse
+import json
 import os
+from qa_diff.comparators import COMPARATORS, DEFAULT_COMPARATORS
 from qa_diff.diff_test_results import get_test_diffs, compare_infores_sources, export_trapi_responses
+from qa_diff.history import (
+    HISTORY_DIR,
+    diff_runs,
+    first_flip,
+    flaky_assets,
+    infores_timeline,
+    ingest_run,
+    list_runs,
+)
+from qa_diff.sampling import sample_infores_sources
 
 
 def main():
@@ -25,18 +37,127 @@ def main():
         "--infores-filter",
         help="Filter to specific infores (e.g., 'infores:ctd')"
     )
+    parser.add_argument(
+        "--comparators",
+        nargs="+",
+        choices=list(COMPARATORS),
+        help=f"Edge comparators to include as report columns in infores mode (default: {' '.join(DEFAULT_COMPARATORS)})"
+    )
+    parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="With --mode infores, estimate counts from a stratified random sample of test assets"
+    )
+    parser.add_argument(
+        "--sample-batch-size",
+        type=int,
+        default=10,
+        help="Number of test assets added per sampling round (default: 10)"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=300,
+        help="Seconds to spend sampling before reporting (default: 300)"
+    )
+    parser.add_argument(
+        "--target-half-width",
+        type=float,
+        default=2,
+        help="Stop sampling once every confidence interval is within this many test assets (default: 2)"
+    )
+    parser.add_argument(
+        "--max-unobserved-fraction",
+        type=float,
+        default=0.25,
+        help="Stop sampling once any infores not seen yet is bounded to this fraction of the candidates (default: 0.25)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Random seed for a reproducible sample"
+    )
     
     args = parser.parse_args()
     
+    if args.sample and args.comparators:
+        parser.error("--comparators does not apply to --sample, which only compares sources")
+    
     os.makedirs("test_diffs", exist_ok=True)
     
     if args.mode == "full":
         get_test_diffs(args.dev_result_path, args.ci_result_path)
+    elif args.mode == "infores" and args.sample:
+        sample_infores_sources(
+            args.dev_result_path,
+            args.ci_result_path,
+            args.infores_filter,
+            batch_size=args.sample_batch_size,
+            time_budget=args.time_budget,
+            target_half_width=args.target_half_width,
+            max_unobserved_fraction=args.max_unobserved_fraction,
+            seed=args.seed,
+        )
     elif args.mode == "infores":
-        compare_infores_sources(args.dev_result_path, args.ci_result_path, args.infores_filter)
+        compare_infores_sources(args.dev_result_path, args.ci_result_path, args.infores_filter, args.comparators)
     elif args.mode == "trapi-export":
         export_trapi_responses(args.dev_result_path, args.ci_result_path)
 
 
+def history_main():
+    parser = argparse.ArgumentParser(
+        description="Query the history of automated test runs."
+    )
+    parser.add_argument(
+        "--history-dir",
+        default=HISTORY_DIR,
+        help=f"Run history directory (default: {HISTORY_DIR})"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Add test CSV output files to the run history")
+    ingest_parser.add_argument("result_paths", nargs="+", help="Paths to test CSV output files")
+
+    runs_parser = subparsers.add_parser("runs", help="List the runs in the history, oldest first")
+    runs_parser.add_argument("--series", help="Only list runs in this series, e.g. 'sprint_6_tests'")
+
+    diff_parser = subparsers.add_parser("diff", help="Test results that pass in the CI run but fail in the Dev run")
+    diff_parser.add_argument("dev_run_id", help="Dev run id, the CSV file name without extension")
+    diff_parser.add_argument("ci_run_id", help="CI run id, the CSV file name without extension")
+
+    flip_parser = subparsers.add_parser("first-flip", help="First run where a test asset's status changed")
+    flip_parser.add_argument("asset_id", help="Test asset, e.g. 'Asset_329'")
+    flip_parser.add_argument("--series", required=True, help="Run series to look in, e.g. 'sprint_6_tests'")
+    flip_parser.add_argument("--agent", default="ars", help="Agent column to check (default: ars)")
+
+    flaky_parser = subparsers.add_parser("flaky", help="Test assets that flip between passing and failing")
+    flaky_parser.add_argument("--series", required=True, help="Run series to look in, e.g. 'sprint_6_tests'")
+    flaky_parser.add_argument("--last", type=int, default=10, help="Number of most recent runs (default: 10)")
+    flaky_parser.add_argument("--agent", default="ars", help="Agent column to check (default: ars)")
+    flaky_parser.add_argument("--min-flips", type=int, default=2, help="Minimum pass/fail changes (default: 2)")
+
+    timeline_parser = subparsers.add_parser("infores-timeline", help="Per-infores regressions across recorded infores comparisons")
+    timeline_parser.add_argument("--infores-filter", help="Filter to specific infores (e.g., 'infores:ctd')")
+
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        for result_path in args.result_paths:
+            ingest_run(result_path, args.history_dir)
+        return
+    elif args.command == "runs":
+        result = list_runs(args.series, args.history_dir)
+    elif args.command == "diff":
+        result = diff_runs(args.dev_run_id, args.ci_run_id, history_dir=args.history_dir)
+    elif args.command == "first-flip":
+        result = first_flip(args.asset_id, args.series, args.agent, args.history_dir)
+    elif args.command == "flaky":
+        result = flaky_assets(args.series, args.last, args.agent, args.min_flips, args.history_dir)
+    elif args.command == "infores-timeline":
+        result = infores_timeline(args.infores_filter, args.history_dir)
+
+    print(json.dumps(result, indent=2))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,288 @@
+"""Registry of edge comparators applied in a single pass over a response's edges.
+
+Each comparator declares the edge fields it needs, the report columns it emits,
+an extract function that pulls its details out of those fields for one infores,
+and a format function that turns the extracted details into column values.
+"""
+
+from typing import Callable, List, Tuple
+
+BASE_COLUMNS = ["infores", "test_asset", "edge_id", "subject", "predicate", "object"]
+
+COMPARATORS = {}
+DEFAULT_COMPARATORS = ["sources", "qualifiers"]
+
+
+def register_comparator(
+    name: str,
+    fields: Tuple[str, ...],
+    columns: List[str],
+    extract: Callable[[dict, str], dict],
+    format_row: Callable[[dict], List[str]],
+    replace: bool = False,
+) -> None:
+    """Register an edge comparator.
+
+    Registering a name that is already taken raises a ValueError, unless replace
+    is set to swap out the existing comparator on purpose.
+
+    Args:
+        name: str - the comparator name, used to select it from the command line
+        fields: tuple - edge fields the comparator reads, e.g. ('sources',). The
+            'attributes' field is passed indexed by attribute_type_id.
+        columns: list - report column names, in the order format_row returns them
+        extract: function - (fields, infores) -> dict of details to store for the edge
+        format_row: function - (details) -> list of column values
+        replace: bool - replace an existing comparator with the same name
+    """
+    if name in COMPARATORS and not replace:
+        raise ValueError(f"comparator {name} is already registered")
+    COMPARATORS[name] = {
+        "fields": fields,
+        "columns": columns,
+        "extract": extract,
+        "format_row": format_row,
+    }
+
+
+def get_comparators(names: List[str] = None) -> List[dict]:
+    """Get registered comparators by name, or the default ones."""
+    if names is None:
+        names = DEFAULT_COMPARATORS
+    return [COMPARATORS[name] for name in names]
+
+
+def get_report_columns(comparators: List[dict]) -> List[str]:
+    """Get the report header for a set of comparators."""
+    columns = list(BASE_COLUMNS)
+    for comparator in comparators:
+        columns.extend(comparator["columns"])
+    return columns
+
+
+def scan_edges(response: dict, infores_filter: str = None, comparators: List[dict] = None) -> Tuple[set, dict]:
+    """Make one pass over a response's edges, dispatching each to every comparator.
+
+    Only the edge fields some comparator asked for are read, and attributes are
+    indexed by type once per edge no matter how many comparators use them.
+
+    Args:
+        response: dict - a TRAPI response
+        infores_filter: str - optional infores to filter (e.g., 'infores:gtopdb')
+        comparators: list - comparators to run; with none, only primary sources are collected
+
+    Returns:
+        the set of primary knowledge sources, and a dict of each source to the
+        detail records of its edges
+    """
+    comparators = comparators or []
+    needed_fields = set()
+    for comparator in comparators:
+        needed_fields.update(comparator["fields"])
+
+    sources = set()
+    edges_by_infores = {}
+    for edge_id, edge in response.get("message", {}).get("knowledge_graph", {}).get("edges", {}).items():
+        edge_sources = []
+        for source in edge.get("sources", []):
+            if source.get("resource_role") == "primary_knowledge_source":
+                source_id = source.get("resource_id")
+                if infores_filter is None or source_id == infores_filter:
+                    edge_sources.append(source_id)
+        if not edge_sources:
+            continue
+        sources.update(edge_sources)
+        if not comparators:
+            continue
+
+        fields = {}
+        for field in needed_fields:
+            if field == "attributes":
+                attributes = {}
+                for attribute in edge.get("attributes") or []:
+                    attributes.setdefault(attribute.get("attribute_type_id"), []).append(attribute.get("value"))
+                fields["attributes"] = attributes
+            else:
+                fields[field] = edge.get(field)
+
+        for source_id in edge_sources:
+            record = {
+                "edge_id": edge_id,
+                "subject": edge.get("subject"),
+                "predicate": edge.get("predicate"),
+                "object": edge.get("object"),
+            }
+            for comparator in comparators:
+                record.update(comparator["extract"](fields, source_id))
+            edges_by_infores.setdefault(source_id, []).append(record)
+
+    return sources, edges_by_infores
+
+
+def format_report_row(infores: str, test_asset: str, record: dict, comparators: List[dict]) -> List[str]:
+    """Format an edge detail record as a report row."""
+    row = [
+        infores,
+        test_asset,
+        record.get("edge_id", ""),
+        record.get("subject", ""),
+        record.get("predicate", ""),
+        record.get("object", ""),
+    ]
+    for comparator in comparators:
+        row.extend(comparator["format_row"](record))
+    return row
+
+
+def _attribute_values(attributes: dict, attribute_type_id: str) -> list:
+    """Flatten the values of every attribute of a type."""
+    values = []
+    for value in attributes.get(attribute_type_id, []):
+        if isinstance(value, list):
+            values.extend(value)
+        elif value is not None:
+            values.append(value)
+    return values
+
+
+def extract_sources(fields: dict, infores: str) -> dict:
+    """Get the primary and aggregator sources matching an infores."""
+    primary_sources = []
+    aggregator_sources = []
+
+    for source in fields.get("sources") or []:
+        source_id = source.get("resource_id")
+        if infores and source_id != infores:
+            continue
+
+        source_info = {
+            "resource_id": source_id,
+            "resource_role": source.get("resource_role"),
+        }
+        if "upstream_resource_ids" in source:
+            source_info["upstream_resource_ids"] = source["upstream_resource_ids"]
+
+        if source.get("resource_role") == "primary_knowledge_source":
+            primary_sources.append(source_info)
+        elif source.get("resource_role") == "aggregator_knowledge_source":
+            aggregator_sources.append(source_info)
+
+    return {
+        "primary_knowledge_sources": primary_sources,
+        "aggregator_knowledge_sources": aggregator_sources,
+    }
+
+
+def format_sources(record: dict) -> List[str]:
+    """Format the sources as pipe-separated resource ids."""
+    return [
+        "|".join([s["resource_id"] for s in record.get("primary_knowledge_sources", [])]),
+        "|".join([s["resource_id"] for s in record.get("aggregator_knowledge_sources", [])]),
+    ]
+
+
+def extract_qualifiers(fields: dict, infores: str) -> dict:
+    """Get the qualifiers of the edge, if it has any."""
+    if fields.get("qualifiers"):
+        return {"qualifiers": fields["qualifiers"]}
+    return {}
+
+
+def format_qualifiers(record: dict) -> List[str]:
+    """Format the object direction, object aspect, and qualified predicate qualifiers."""
+    object_direction = ""
+    object_aspect = ""
+    qualified_predicate = ""
+
+    for qualifier in record.get("qualifiers", []):
+        qtype = qualifier.get("qualifier_type_id", "")
+        qvalue = qualifier.get("qualifier_value", "")
+
+        if qtype == "biolink:object_direction_qualifier":
+            object_direction = qvalue
+        elif qtype == "biolink:object_aspect_qualifier":
+            object_aspect = qvalue
+        elif qtype == "biolink:qualified_predicate":
+            qualified_predicate = qvalue
+
+    return [object_direction, object_aspect, qualified_predicate]
+
+
+def extract_publications(fields: dict, infores: str) -> dict:
+    """Get the biolink:publications of the edge."""
+    publications = _attribute_values(fields["attributes"], "biolink:publications")
+    if publications:
+        return {"publications": publications}
+    return {}
+
+
+def format_publications(record: dict) -> List[str]:
+    """Format the publications as pipe-separated ids."""
+    return ["|".join([str(p) for p in record.get("publications", [])])]
+
+
+def extract_support_graphs(fields: dict, infores: str) -> dict:
+    """Get the auxiliary graph ids from biolink:support_graphs of the edge."""
+    support_graphs = _attribute_values(fields["attributes"], "biolink:support_graphs")
+    if support_graphs:
+        return {"support_graphs": support_graphs}
+    return {}
+
+
+def format_support_graphs(record: dict) -> List[str]:
+    """Format the support graphs as pipe-separated ids."""
+    return ["|".join([str(g) for g in record.get("support_graphs", [])])]
+
+
+def extract_knowledge_level(fields: dict, infores: str) -> dict:
+    """Get the biolink:knowledge_level and biolink:agent_type of the edge."""
+    details = {}
+    knowledge_level = _attribute_values(fields["attributes"], "biolink:knowledge_level")
+    if knowledge_level:
+        details["knowledge_level"] = knowledge_level[0]
+    agent_type = _attribute_values(fields["attributes"], "biolink:agent_type")
+    if agent_type:
+        details["agent_type"] = agent_type[0]
+    return details
+
+
+def format_knowledge_level(record: dict) -> List[str]:
+    """Format the knowledge level and agent type."""
+    return [str(record.get("knowledge_level", "")), str(record.get("agent_type", ""))]
+
+
+register_comparator(
+    "sources",
+    ("sources",),
+    ["primary_knowledge_source", "aggregator_knowledge_source"],
+    extract_sources,
+    format_sources,
+)
+register_comparator(
+    "qualifiers",
+    ("qualifiers",),
+    ["object_direction_qualifier", "object_aspect_qualifier", "qualified_predicate"],
+    extract_qualifiers,
+    format_qualifiers,
+)
+register_comparator(
+    "publications",
+    ("attributes",),
+    ["publications"],
+    extract_publications,
+    format_publications,
+)
+register_comparator(
+    "support_graphs",
+    ("attributes",),
+    ["support_graphs"],
+    extract_support_graphs,
+    format_support_graphs,
+)
+register_comparator(
+    "knowledge_level",
+    ("attributes",),
+    ["knowledge_level", "agent_type"],
+    extract_knowledge_level,
+    format_knowledge_level,
+)
@@ -1,12 +1,23 @@
 """Create a list of tests that pass in CI but fail in Dev."""
 
-import csv
 import json
 import os
-from typing import Tuple
+from typing import List, Tuple
 
 import httpx
 
+from qa_diff.comparators import (
+    format_report_row,
+    get_comparators,
+    get_report_columns,
+    scan_edges,
+)
+from qa_diff.history import (
+    diff_runs,
+    get_run_id,
+    ingest_run,
+    record_infores_summary,
+)
 from qa_diff.shared import (
     recursive_get_auxgraph_edges,
     recursive_get_edge_support_graphs,
@@ -32,39 +43,7 @@ def get_test_diffs(dev_result_path: str, ci_result_path: str) -> None:
         dev_result_path: str - the local path to an automated test csv output file.
         ci_result_path: str - the local path to an automated test csv output file.
     """
-    dev_results = {}
-    with open(dev_result_path, encoding="utf-8") as f:
-        csv_reader = csv.reader(f)
-        columns = next(csv_reader)
-        for row in csv_reader:
-            row_dict = dict(zip(columns, row))
-            dev_results[row_dict["TestAsset"]] = row_dict
-
-    ci_results = {}
-    with open(ci_result_path, encoding="utf-8") as f:
-        csv_reader = csv.reader(f)
-        columns = next(csv_reader)
-        for row in csv_reader:
-            row_dict = dict(zip(columns, row))
-            ci_results[row_dict["TestAsset"]] = row_dict
-
-    diff_results = {}
-    for test_asset, results in ci_results.items():
-        if (
-            results["ars"] == "PASSED" and (
-                dev_results[test_asset]["ars"] == "FAILED" or
-                dev_results[test_asset]["ars"] == "DONE" or
-                dev_results[test_asset]["ars"] == "No results"
-            )
-        ):
-            diff_results[test_asset] = {
-                "ci": {
-                    **results,
-                },
-                "dev": {
-                    **dev_results[test_asset]
-                },
-            }
+    diff_results = get_diff_results(dev_result_path, ci_result_path)
 
     print(f"{len(diff_results.keys())} failed tests.")
     with open("test_diffs/diff_test_results.json", "w", encoding="utf-8") as f:
@@ -80,22 +59,7 @@ def get_test_diffs(dev_result_path: str, ci_result_path: str) -> None:
             continue
         print(asset_id)
         ci_pk, dev_pk = get_pks(result)
-        ci_response_path = f"test_diffs/{asset_id}_ars_response_ci.json"
-        if not os.path.exists(ci_response_path):
-            ci_response = get_response_from_ars(ARS_CI_URL, ci_pk)
-            with open(ci_response_path, "w", encoding="utf-8") as f:
-                json.dump(ci_response, f, indent=2)
-        else:
-            with open(ci_response_path, "r", encoding="utf-8") as f:
-                ci_response = json.load(f)
-        dev_response_path = f"test_diffs/{asset_id}_ars_response_dev.json"
-        if not os.path.exists(dev_response_path):
-            dev_response = get_response_from_ars(ARS_DEV_URL, dev_pk)
-            with open(dev_response_path, "w", encoding="utf-8") as f:
-                json.dump(dev_response, f, indent=2)
-        else:
-            with open(dev_response_path, "r", encoding="utf-8") as f:
-                dev_response = json.load(f)
+        ci_response, dev_response = load_ars_responses(asset_id, ci_pk, dev_pk)
         normalized_curie = normalize_curie(asset["output_id"])
         found_result = False
         for result in ci_response["message"]["results"]:
@@ -132,93 +96,22 @@ def get_test_diffs(dev_result_path: str, ci_result_path: str) -> None:
         json.dump(source_counts, f, indent=2)
 
 
-def extract_edge_details(edge: dict, edge_id: str, target_infores: str = None) -> dict:
-    """Extract detailed information from an edge for reporting.
-    
-    Args:
-        edge: dict - the edge object from the knowledge graph
-        edge_id: str - the edge identifier
-        target_infores: str - optional infores to filter sources
-    
-    Returns:
-        dict with edge details including subject, predicate, object, sources, and qualifiers
-    """
-    primary_sources = []
-    aggregator_sources = []
-    
-    for source in edge.get("sources", []):
-        source_id = source.get("resource_id")
-        if target_infores and source_id != target_infores:
-            continue
-        
-        source_info = {
-            "resource_id": source_id,
-            "resource_role": source.get("resource_role"),
-        }
-        if "upstream_resource_ids" in source:
-            source_info["upstream_resource_ids"] = source["upstream_resource_ids"]
-        
-        if source.get("resource_role") == "primary_knowledge_source":
-            primary_sources.append(source_info)
-        elif source.get("resource_role") == "aggregator_knowledge_source":
-            aggregator_sources.append(source_info)
-    
-    edge_detail = {
-        "edge_id": edge_id,
-        "subject": edge.get("subject"),
-        "predicate": edge.get("predicate"),
-        "object": edge.get("object"),
-        "primary_knowledge_sources": primary_sources,
-        "aggregator_knowledge_sources": aggregator_sources,
-    }
-    
-    if "qualifiers" in edge and edge["qualifiers"]:
-        edge_detail["qualifiers"] = edge["qualifiers"]
-    
-    return edge_detail
-
-
-def compare_infores_sources(dev_result_path: str, ci_result_path: str, infores_filter: str = None) -> None:
+def compare_infores_sources(
+    dev_result_path: str,
+    ci_result_path: str,
+    infores_filter: str = None,
+    comparator_names: List[str] = None,
+) -> None:
     """Compare infores sources between CI and Dev for specific test assets.
     
     Args:
         dev_result_path: str - the local path to an automated test csv output file.
         ci_result_path: str - the local path to an automated test csv output file.
         infores_filter: str - optional infores to filter (e.g., 'infores:gtopdb')
+        comparator_names: list - optional edge comparators to report, defaults to sources and qualifiers
     """
-    dev_results = {}
-    with open(dev_result_path, encoding="utf-8") as f:
-        csv_reader = csv.reader(f)
-        columns = next(csv_reader)
-        for row in csv_reader:
-            row_dict = dict(zip(columns, row))
-            dev_results[row_dict["TestAsset"]] = row_dict
-
-    ci_results = {}
-    with open(ci_result_path, encoding="utf-8") as f:
-        csv_reader = csv.reader(f)
-        columns = next(csv_reader)
-        for row in csv_reader:
-            row_dict = dict(zip(columns, row))
-            ci_results[row_dict["TestAsset"]] = row_dict
-
-    diff_results = {}
-    for test_asset, results in ci_results.items():
-        if (
-            results["ars"] == "PASSED" and (
-                dev_results[test_asset]["ars"] == "FAILED" or
-                dev_results[test_asset]["ars"] == "DONE" or
-                dev_results[test_asset]["ars"] == "No results"
-            )
-        ):
-            diff_results[test_asset] = {
-                "ci": {
-                    **results,
-                },
-                "dev": {
-                    **dev_results[test_asset]
-                },
-            }
+    diff_results = get_diff_results(dev_result_path, ci_result_path)
+    comparators = get_comparators(comparator_names)
 
     print(f"{len(diff_results.keys())} failed tests.")
     
@@ -236,48 +129,10 @@ def compare_infores_sources(dev_result_path: str, ci_result_path: str, infores_f
         print(f"Processing {asset_id}")
         ci_pk, dev_pk = get_pks(result)
         
-        ci_response_path = f"test_diffs/{asset_id}_ars_response_ci.json"
-        if not os.path.exists(ci_response_path):
-            ci_response = get_response_from_ars(ARS_CI_URL, ci_pk)
-            with open(ci_response_path, "w", encoding="utf-8") as f:
-                json.dump(ci_response, f, indent=2)
-        else:
-            with open(ci_response_path, "r", encoding="utf-8") as f:
-                ci_response = json.load(f)
-        
-        dev_response_path = f"test_diffs/{asset_id}_ars_response_dev.json"
-        if not os.path.exists(dev_response_path):
-            dev_response = get_response_from_ars(ARS_DEV_URL, dev_pk)
-            with open(dev_response_path, "w", encoding="utf-8") as f:
-                json.dump(dev_response, f, indent=2)
-        else:
-            with open(dev_response_path, "r", encoding="utf-8") as f:
-                dev_response = json.load(f)
-        
-        ci_sources = set()
-        dev_sources = set()
-        ci_edges_by_infores = {}
-        dev_edges_by_infores = {}
+        ci_response, dev_response = load_ars_responses(asset_id, ci_pk, dev_pk)
         
-        for edge_id, edge in ci_response.get("message", {}).get("knowledge_graph", {}).get("edges", {}).items():
-            for source in edge.get("sources", []):
-                if source.get("resource_role") == "primary_knowledge_source":
-                    source_id = source.get("resource_id")
-                    if infores_filter is None or source_id == infores_filter:
-                        ci_sources.add(source_id)
-                        if source_id not in ci_edges_by_infores:
-                            ci_edges_by_infores[source_id] = []
-                        ci_edges_by_infores[source_id].append(extract_edge_details(edge, edge_id, source_id))
-        
-        for edge_id, edge in dev_response.get("message", {}).get("knowledge_graph", {}).get("edges", {}).items():
-            for source in edge.get("sources", []):
-                if source.get("resource_role") == "primary_knowledge_source":
-                    source_id = source.get("resource_id")
-                    if infores_filter is None or source_id == infores_filter:
-                        dev_sources.add(source_id)
-                        if source_id not in dev_edges_by_infores:
-                            dev_edges_by_infores[source_id] = []
-                        dev_edges_by_infores[source_id].append(extract_edge_details(edge, edge_id, source_id))
+        ci_sources, ci_edges_by_infores = scan_edges(ci_response, infores_filter, comparators)
+        dev_sources, _ = scan_edges(dev_response, infores_filter)
         
         only_in_ci = ci_sources - dev_sources
         only_in_dev = dev_sources - ci_sources
@@ -317,6 +172,8 @@ def compare_infores_sources(dev_result_path: str, ci_result_path: str, infores_f
     with open(summary_file, "w", encoding="utf-8") as f:
         json.dump(summary, f, indent=2)
     
+    record_infores_summary(get_run_id(dev_result_path), get_run_id(ci_result_path), summary, infores_filter)
+    
     detailed_summary_file = "test_diffs/infores_edges_only_in_ci_detailed.json"
     if infores_filter:
         detailed_summary_file = f"test_diffs/infores_edges_only_in_ci_detailed_{infores_filter.replace(':', '_')}.json"
@@ -329,54 +186,12 @@ def compare_infores_sources(dev_result_path: str, ci_result_path: str, infores_f
         tsv_file = f"test_diffs/infores_edges_only_in_ci_detailed_{infores_filter.replace(':', '_')}.tsv"
     
     with open(tsv_file, "w", encoding="utf-8") as f:
-        f.write("\t".join([
-            "infores",
-            "test_asset",
-            "edge_id",
-            "subject",
-            "predicate",
-            "object",
-            "primary_knowledge_source",
-            "aggregator_knowledge_source",
-            "object_direction_qualifier",
-            "object_aspect_qualifier",
-            "qualified_predicate"
-        ]) + "\n")
+        f.write("\t".join(get_report_columns(comparators)) + "\n")
         
         for infores, test_assets in detailed_edges_by_infores.items():
             for test_asset, edges in test_assets.items():
                 for edge in edges:
-                    primary_sources = "|".join([s["resource_id"] for s in edge.get("primary_knowledge_sources", [])])
-                    aggregator_sources = "|".join([s["resource_id"] for s in edge.get("aggregator_knowledge_sources", [])])
-                    
-                    object_direction = ""
-                    object_aspect = ""
-                    qualified_predicate = ""
-                    
-                    for qualifier in edge.get("qualifiers", []):
-                        qtype = qualifier.get("qualifier_type_id", "")
-                        qvalue = qualifier.get("qualifier_value", "")
-                        
-                        if qtype == "biolink:object_direction_qualifier":
-                            object_direction = qvalue
-                        elif qtype == "biolink:object_aspect_qualifier":
-                            object_aspect = qvalue
-                        elif qtype == "biolink:qualified_predicate":
-                            qualified_predicate = qvalue
-                    
-                    f.write("\t".join([
-                        infores,
-                        test_asset,
-                        edge.get("edge_id", ""),
-                        edge.get("subject", ""),
-                        edge.get("predicate", ""),
-                        edge.get("object", ""),
-                        primary_sources,
-                        aggregator_sources,
-                        object_direction,
-                        object_aspect,
-                        qualified_predicate
-                    ]) + "\n")
+                    f.write("\t".join(format_report_row(infores, test_asset, edge, comparators)) + "\n")
     
     print(f"\nSources only in CI (not in Dev):")
     for source, data in sorted(summary.items(), key=lambda x: x[1]["count"], reverse=True):
@@ -395,39 +210,7 @@ def export_trapi_responses(dev_result_path: str, ci_result_path: str) -> None:
         dev_result_path: str - the local path to an automated test csv output file.
         ci_result_path: str - the local path to an automated test csv output file.
     """
-    dev_results = {}
-    with open(dev_result_path, encoding="utf-8") as f:
-        csv_reader = csv.reader(f)
-        columns = next(csv_reader)
-        for row in csv_reader:
-            row_dict = dict(zip(columns, row))
-            dev_results[row_dict["TestAsset"]] = row_dict
-
-    ci_results = {}
-    with open(ci_result_path, encoding="utf-8") as f:
-        csv_reader = csv.reader(f)
-        columns = next(csv_reader)
-        for row in csv_reader:
-            row_dict = dict(zip(columns, row))
-            ci_results[row_dict["TestAsset"]] = row_dict
-
-    diff_results = {}
-    for test_asset, results in ci_results.items():
-        if (
-            results["ars"] == "PASSED" and (
-                dev_results[test_asset]["ars"] == "FAILED" or
-                dev_results[test_asset]["ars"] == "DONE" or
-                dev_results[test_asset]["ars"] == "No results"
-            )
-        ):
-            diff_results[test_asset] = {
-                "ci": {
-                    **results,
-                },
-                "dev": {
-                    **dev_results[test_asset]
-                },
-            }
+    diff_results = get_diff_results(dev_result_path, ci_result_path)
 
     print(f"{len(diff_results.keys())} tests pass in CI but fail in Dev.")
     
@@ -444,23 +227,7 @@ def export_trapi_responses(dev_result_path: str, ci_result_path: str) -> None:
         print(f"Processing {asset_id}")
         ci_pk, dev_pk = get_pks(result)
         
-        ci_response_path = f"test_diffs/{asset_id}_ars_response_ci.json"
-        if not os.path.exists(ci_response_path):
-            ci_response = get_response_from_ars(ARS_CI_URL, ci_pk)
-            with open(ci_response_path, "w", encoding="utf-8") as f:
-                json.dump(ci_response, f, indent=2)
-        else:
-            with open(ci_response_path, "r", encoding="utf-8") as f:
-                ci_response = json.load(f)
-        
-        dev_response_path = f"test_diffs/{asset_id}_ars_response_dev.json"
-        if not os.path.exists(dev_response_path):
-            dev_response = get_response_from_ars(ARS_DEV_URL, dev_pk)
-            with open(dev_response_path, "w", encoding="utf-8") as f:
-                json.dump(dev_response, f, indent=2)
-        else:
-            with open(dev_response_path, "r", encoding="utf-8") as f:
-                dev_response = json.load(f)
+        ci_response, dev_response = load_ars_responses(asset_id, ci_pk, dev_pk)
         
         trapi_responses[asset_id] = {
             "ci_response": ci_response,
@@ -522,6 +289,39 @@ def get_pks(test_result: dict) -> Tuple[str, str]:
     )
 
 
+def get_diff_results(dev_result_path: str, ci_result_path: str) -> dict:
+    """Get the test results that pass in CI but fail in Dev, keyed by test asset.
+
+    Both runs are added to the run history if they are not there already.
+    """
+    dev_run_id = ingest_run(dev_result_path)
+    ci_run_id = ingest_run(ci_result_path)
+    return diff_runs(dev_run_id, ci_run_id)
+
+
+def load_ars_responses(asset_id: str, ci_pk: str, dev_pk: str) -> Tuple[dict, dict]:
+    """Get the CI and Dev ARS responses for a test asset, using the local cache if present."""
+    ci_response_path = f"test_diffs/{asset_id}_ars_response_ci.json"
+    if not os.path.exists(ci_response_path):
+        ci_response = get_response_from_ars(ARS_CI_URL, ci_pk)
+        with open(ci_response_path, "w", encoding="utf-8") as f:
+            json.dump(ci_response, f, indent=2)
+    else:
+        with open(ci_response_path, "r", encoding="utf-8") as f:
+            ci_response = json.load(f)
+
+    dev_response_path = f"test_diffs/{asset_id}_ars_response_dev.json"
+    if not os.path.exists(dev_response_path):
+        dev_response = get_response_from_ars(ARS_DEV_URL, dev_pk)
+        with open(dev_response_path, "w", encoding="utf-8") as f:
+            json.dump(dev_response, f, indent=2)
+    else:
+        with open(dev_response_path, "r", encoding="utf-8") as f:
+            dev_response = json.load(f)
+
+    return ci_response, dev_response
+
+
 def get_response_from_ars(ars_url: str, pk: str) -> dict:
     """Get a full TRAPI message from ARS."""
     print("Getting response from ARS.")
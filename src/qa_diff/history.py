@@ -0,0 +1,390 @@
+"""Append-only store of automated test runs for queries across many runs.
+
+Each run CSV is parsed once and appended as a single compact line to the data
+file, with its byte offset recorded in the index, so ingesting a run costs time
+proportional to that run and any run can be loaded without reading the others.
+A run line keeps the CSV column list once and each column's distinct values
+once, and stores every test asset's row as codes into those values, so repeated
+statuses, pk links and TestCases cost a small integer per asset.
+
+Runs belong to a series, e.g. 'sprint_6_tests' for CI or 'dev_refactor_tests'
+for Dev, and trend queries only compare runs within one series.
+"""
+
+import csv
+import json
+import os
+import re
+from typing import Optional
+
+HISTORY_DIR = "run_history"
+INDEX_FILE = "runs.jsonl"
+DATA_FILE = "runs.data.jsonl"
+INFORES_FILE = "infores.jsonl"
+FAILED_STATUSES = ("FAILED", "DONE", "No results")
+RUN_TIMESTAMP = re.compile(r"(\d{4})_(\d{2})_(\d{2})_(\d{2})_(\d{2})")
+
+
+def get_run_id(result_path: str) -> str:
+    """Get the run id of a test csv output file, its file name without extension."""
+    return os.path.splitext(os.path.basename(result_path))[0]
+
+
+def get_run_timestamp(run_id: str) -> Optional[str]:
+    """Get the run time from a run id like 'sprint_6_tests_ 2026_01_04_05_00'."""
+    match = RUN_TIMESTAMP.search(run_id)
+    if match is None:
+        return None
+    year, month, day, hour, minute = match.groups()
+    return f"{year}-{month}-{day}T{hour}:{minute}"
+
+
+def get_run_series(run_id: str) -> str:
+    """Get the series of a run id, e.g. 'sprint_6_tests' for 'sprint_6_tests_ 2026_01_04_05_00'."""
+    return re.sub(r"[_\s]*" + RUN_TIMESTAMP.pattern + r"$", "", run_id) or run_id
+
+
+def read_index(history_dir: str = HISTORY_DIR) -> dict:
+    """Read the run index, keyed by run id. Later entries for a run replace earlier ones."""
+    index = {}
+    index_path = os.path.join(history_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return index
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            index.pop(entry["run_id"], None)
+            index[entry["run_id"]] = entry
+    return index
+
+
+def list_runs(series: str = None, history_dir: str = HISTORY_DIR) -> list:
+    """List the index entries of the runs in a series, or of all runs, oldest first.
+
+    Runs are ordered by the time in their run id, falling back to ingestion order.
+    """
+    entries = [
+        entry for entry in read_index(history_dir).values()
+        if series is None or entry["series"] == series
+    ]
+    return sorted(
+        entries,
+        key=lambda entry: (entry["timestamp"] is None, entry["timestamp"] or ""),
+    )
+
+
+def ingest_run(result_path: str, history_dir: str = HISTORY_DIR) -> str:
+    """Add a test csv output file to the run history.
+
+    A file that was already ingested and has not changed since is skipped.
+
+    Args:
+        result_path: str - the local path to an automated test csv output file.
+        history_dir: str - the run history directory
+
+    Returns:
+        the run id
+    """
+    run_id = get_run_id(result_path)
+    stat = os.stat(result_path)
+    entry = read_index(history_dir).get(run_id)
+    if (
+        entry is not None and
+        entry["size"] == stat.st_size and
+        entry["mtime"] == stat.st_mtime
+    ):
+        return run_id
+
+    values = []
+    codes_by_value = []
+    rows = {}
+    with open(result_path, encoding="utf-8") as f:
+        csv_reader = csv.reader(f)
+        columns = next(csv_reader)
+        asset_column = columns.index("TestAsset")
+        for _ in columns:
+            values.append([])
+            codes_by_value.append({})
+        for row in csv_reader:
+            codes = []
+            for position, value in enumerate(row[:len(columns)]):
+                if position == asset_column:
+                    continue
+                if value not in codes_by_value[position]:
+                    codes_by_value[position][value] = len(values[position])
+                    values[position].append(value)
+                codes.append(codes_by_value[position][value])
+            rows[row[asset_column]] = codes
+
+    os.makedirs(history_dir, exist_ok=True)
+    del values[asset_column]
+    line = json.dumps({
+        "run_id": run_id,
+        "columns": columns,
+        "values": values,
+        "rows": rows,
+    }, separators=(",", ":")) + "\n"
+    with open(os.path.join(history_dir, DATA_FILE), "ab") as f:
+        f.seek(0, os.SEEK_END)
+        offset = f.tell()
+        f.write(line.encode("utf-8"))
+
+    entry = {
+        "run_id": run_id,
+        "series": get_run_series(run_id),
+        "timestamp": get_run_timestamp(run_id),
+        "source": result_path,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "offset": offset,
+        "length": len(line.encode("utf-8")),
+        "assets": len(rows),
+    }
+    with open(os.path.join(history_dir, INDEX_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+    print(f"Ingested {len(rows)} test results from {result_path} as run {run_id}.")
+    return run_id
+
+
+def read_run(run_id: str, history_dir: str = HISTORY_DIR, index: dict = None) -> dict:
+    """Read the compact record of a run: its columns, each column's distinct values, and coded rows."""
+    if index is None:
+        index = read_index(history_dir)
+    if run_id not in index:
+        raise KeyError(f"run {run_id} not in run history")
+    entry = index[run_id]
+    with open(os.path.join(history_dir, DATA_FILE), "rb") as f:
+        f.seek(entry["offset"])
+        return json.loads(f.read(entry["length"]).decode("utf-8"))
+
+
+def get_column_values(record: dict, column: str) -> Optional[list]:
+    """Get the distinct values of a column in a run record, or None if the run doesn't have it."""
+    if column not in record["columns"] or column == "TestAsset":
+        return None
+    return record["values"][_get_code_position(record, column)]
+
+
+def _get_code_position(record: dict, column: str) -> int:
+    """Get the position of a column's code in a row, which leaves out TestAsset."""
+    position = record["columns"].index(column)
+    if position > record["columns"].index("TestAsset"):
+        position -= 1
+    return position
+
+
+def load_run(run_id: str, history_dir: str = HISTORY_DIR, index: dict = None) -> dict:
+    """Load the test results of a run as its CSV rows, keyed by test asset."""
+    record = read_run(run_id, history_dir, index)
+    asset_position = record["columns"].index("TestAsset")
+    results = {}
+    for asset_id, codes in record["rows"].items():
+        row = [
+            column_values[code]
+            for column_values, code in zip(record["values"], codes)
+        ]
+        row.insert(asset_position, asset_id)
+        results[asset_id] = dict(zip(record["columns"], row))
+    return results
+
+
+def get_statuses(
+    series: str,
+    agent: str = "ars",
+    last_n: int = None,
+    asset_id: str = None,
+    history_dir: str = HISTORY_DIR,
+) -> dict:
+    """Get test asset statuses for an agent across the runs of a series, oldest first.
+
+    Args:
+        series: str - the run series, e.g. 'sprint_6_tests'
+        agent: str - the agent column to read
+        last_n: int - optional number of most recent runs to read
+        asset_id: str - optional test asset to read, instead of all of them
+        history_dir: str - the run history directory
+
+    Returns:
+        dict with the ordered run ids, and each test asset's statuses by run
+        (None where the asset or agent was not in a run)
+    """
+    index = read_index(history_dir)
+    run_ids = [entry["run_id"] for entry in list_runs(series, history_dir)]
+    if last_n is not None:
+        run_ids = run_ids[-last_n:]
+    statuses = {}
+    for position, run_id in enumerate(run_ids):
+        record = read_run(run_id, history_dir, index)
+        agent_values = get_column_values(record, agent)
+        if agent_values is None:
+            continue
+        code_position = _get_code_position(record, agent)
+        rows = record["rows"]
+        if asset_id is not None:
+            rows = {asset_id: rows[asset_id]} if asset_id in rows else {}
+        for row_asset_id, codes in rows.items():
+            if row_asset_id not in statuses:
+                statuses[row_asset_id] = [None] * len(run_ids)
+            statuses[row_asset_id][position] = agent_values[codes[code_position]]
+    return {"runs": run_ids, "statuses": statuses}
+
+
+def diff_runs(
+    dev_run_id: str,
+    ci_run_id: str,
+    agent: str = "ars",
+    history_dir: str = HISTORY_DIR,
+) -> dict:
+    """Get the test results that pass in the CI run but fail in the Dev run."""
+    index = read_index(history_dir)
+    dev_results = load_run(dev_run_id, history_dir, index)
+    ci_results = load_run(ci_run_id, history_dir, index)
+
+    diff_results = {}
+    for test_asset, results in ci_results.items():
+        if (
+            results[agent] == "PASSED" and
+            dev_results[test_asset][agent] in FAILED_STATUSES
+        ):
+            diff_results[test_asset] = {
+                "ci": {
+                    **results,
+                },
+                "dev": {
+                    **dev_results[test_asset]
+                },
+            }
+
+    return diff_results
+
+
+def first_flip(asset_id: str, series: str, agent: str = "ars", history_dir: str = HISTORY_DIR) -> dict:
+    """Find the first run in a series where a test asset's status changed from the run before it.
+
+    Returns:
+        dict with the run, the run before it, and the statuses, or None if it never changed
+    """
+    history = get_statuses(series, agent, asset_id=asset_id, history_dir=history_dir)
+    previous_run = None
+    previous_status = None
+    for run_id, status in zip(history["runs"], history["statuses"].get(asset_id, [])):
+        if status is None:
+            continue
+        if previous_run is not None and status != previous_status:
+            return {
+                "run_id": run_id,
+                "previous_run_id": previous_run,
+                "from": previous_status,
+                "to": status,
+            }
+        previous_run = run_id
+        previous_status = status
+    return None
+
+
+def flaky_assets(
+    series: str,
+    last_n: int = 10,
+    agent: str = "ars",
+    min_flips: int = 2,
+    history_dir: str = HISTORY_DIR,
+) -> dict:
+    """Find test assets that flip between passing and failing across the last runs of a series.
+
+    Args:
+        series: str - the run series, e.g. 'sprint_6_tests'
+        last_n: int - number of most recent runs to look at
+        agent: str - the agent column to check
+        min_flips: int - minimum number of pass/fail changes to count as flaky
+        history_dir: str - the run history directory
+
+    Returns:
+        dict of each flaky test asset to its number of flips and statuses by run
+    """
+    history = get_statuses(series, agent, last_n, history_dir=history_dir)
+    flaky = {}
+    for asset_id, statuses in history["statuses"].items():
+        passes = [status == "PASSED" for status in statuses if status is not None]
+        flips = sum(1 for before, after in zip(passes, passes[1:]) if before != after)
+        if flips >= min_flips:
+            flaky[asset_id] = {
+                "flips": flips,
+                "statuses": dict(zip(history["runs"], statuses)),
+            }
+    return flaky
+
+
+def record_infores_summary(
+    dev_run_id: str,
+    ci_run_id: str,
+    summary: dict,
+    infores_filter: str = None,
+    history_dir: str = HISTORY_DIR,
+) -> None:
+    """Append the sources only in CI from an infores comparison to the run history.
+
+    Args:
+        dev_run_id: str - the Dev run compared
+        ci_run_id: str - the CI run compared
+        summary: dict - each source only in CI to its count and test assets
+        infores_filter: str - the infores the comparison was filtered to, if any
+        history_dir: str - the run history directory
+    """
+    os.makedirs(history_dir, exist_ok=True)
+    with open(os.path.join(history_dir, INFORES_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "dev_run_id": dev_run_id,
+            "ci_run_id": ci_run_id,
+            "infores_filter": infores_filter,
+            "summary": summary,
+        }) + "\n")
+
+
+def infores_timeline(infores: str = None, history_dir: str = HISTORY_DIR) -> dict:
+    """Get the number of test assets each source was missing from, by Dev run.
+
+    Built from the infores comparisons recorded in the run history. The latest
+    comparison of a pair of runs replaces everything it covered: all sources for
+    an unfiltered comparison, or just its infores for a filtered one.
+
+    Args:
+        infores: str - optional infores to filter (e.g., 'infores:ctd')
+        history_dir: str - the run history directory
+
+    Returns:
+        dict of each source to its regressions, oldest Dev run first
+    """
+    infores_path = os.path.join(history_dir, INFORES_FILE)
+    if not os.path.exists(infores_path):
+        return {}
+
+    by_runs = {}
+    with open(infores_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            runs = (record["dev_run_id"], record["ci_run_id"])
+            infores_filter = record.get("infores_filter")
+            if infores_filter is None:
+                by_runs[runs] = dict(record["summary"])
+            else:
+                by_runs.setdefault(runs, {}).pop(infores_filter, None)
+                if infores_filter in record["summary"]:
+                    by_runs[runs][infores_filter] = record["summary"][infores_filter]
+
+    run_order = {entry["run_id"]: position for position, entry in enumerate(list_runs(history_dir=history_dir))}
+    timeline = {}
+    for (dev_run_id, ci_run_id), summary in sorted(
+        by_runs.items(),
+        key=lambda item: run_order.get(item[0][0], len(run_order)),
+    ):
+        for source, data in summary.items():
+            if infores is not None and source != infores:
+                continue
+            timeline.setdefault(source, []).append({
+                "dev_run_id": dev_run_id,
+                "ci_run_id": ci_run_id,
+                "count": data["count"],
+                "test_assets": data["test_assets"],
+            })
+    return timeline
@@ -0,0 +1,271 @@
+"""Estimate infores regressions from a stratified random sample of test assets."""
+
+import json
+import math
+import random
+import time
+
+from qa_diff.comparators import scan_edges
+from qa_diff.diff_test_results import (
+    get_diff_results,
+    get_pks,
+    get_test_asset,
+    load_ars_responses,
+)
+
+TARGET_OUTPUTS = ("TopAnswer", "Acceptable")
+KNOWN_OUTPUTS = ("TopAnswer", "Acceptable", "BadButForgivable", "NeverShow")
+MIN_STRATUM_SIZE = 5
+
+
+def get_expected_output(test_result: dict) -> str:
+    """Get the expected output from a test result row, e.g. 'Acceptable: X treats Y'."""
+    prefix, _, _ = test_result["name"].partition(":")
+    if prefix.strip() in KNOWN_OUTPUTS:
+        return prefix.strip()
+    return ""
+
+
+def stratify_diff_results(diff_results: dict, min_stratum_size: int = MIN_STRATUM_SIZE) -> dict:
+    """Group test assets by expected output and TestCase.
+
+    Assets whose expected output is known from the test name and is not one we
+    analyze are dropped up front so they never cost a fetch. Assets with no
+    recognizable expected output are kept in their own strata and checked
+    against the test asset when sampled. TestCases with fewer than
+    min_stratum_size assets are pooled per expected output, so small TestCases
+    don't each demand their own sample.
+
+    Args:
+        diff_results: dict - test results that pass in CI but fail in Dev.
+        min_stratum_size: int - smallest TestCase that gets a stratum of its own
+
+    Returns:
+        dict of stratum key to the list of test assets in it
+    """
+    groups = {}
+    for asset_id, result in diff_results.items():
+        expected_output = get_expected_output(result["ci"])
+        if expected_output and expected_output not in TARGET_OUTPUTS:
+            continue
+        group = (expected_output or "Unknown", result["ci"]["TestCase"])
+        groups.setdefault(group, []).append(asset_id)
+
+    strata = {}
+    for (expected_output, test_case), assets in groups.items():
+        if len(assets) < min_stratum_size:
+            test_case = "pooled"
+        strata.setdefault(f"{expected_output}|{test_case}", []).extend(assets)
+    return strata
+
+
+def allocate_samples(remaining: dict, batch_size: int) -> dict:
+    """Split a batch across strata in proportion to their unsampled assets.
+
+    Uses largest remainders so the allocation sums to the batch size, capped by
+    what each stratum has left.
+    """
+    total = sum(len(assets) for assets in remaining.values())
+    batch_size = min(batch_size, total)
+    if batch_size <= 0:
+        return {}
+    quotas = {
+        stratum: batch_size * len(assets) / total
+        for stratum, assets in remaining.items()
+        if assets
+    }
+    allocation = {stratum: int(quota) for stratum, quota in quotas.items()}
+    leftover = batch_size - sum(allocation.values())
+    for stratum in sorted(quotas, key=lambda s: quotas[s] - allocation[s], reverse=True)[:leftover]:
+        allocation[stratum] += 1
+    return {stratum: count for stratum, count in allocation.items() if count}
+
+
+def estimate_only_in_ci_counts(strata: dict, observations: dict, z: float = 1.96) -> dict:
+    """Extrapolate per-infores only-in-CI asset counts from the sampled assets.
+
+    Uses the stratified estimator of a population total, with a finite population
+    correction. Each stratum's variance uses the Agresti-Coull adjusted rate, so
+    strata with all or no hits, or a single sample, still get a nonzero width. A
+    stratum with no samples contributes the midpoint of its range and widens the
+    interval to cover all of it.
+
+    Args:
+        strata: dict - stratum key to the list of all test assets in it
+        observations: dict - stratum key to a list of only-in-CI infores sets, one per sampled asset
+        z: float - normal quantile for the confidence level
+
+    Returns:
+        dict of infores to its observed count, estimate, and confidence bounds
+    """
+    all_infores = set()
+    for sampled in observations.values():
+        for only_in_ci in sampled:
+            all_infores.update(only_in_ci)
+
+    estimates = {}
+    for infores in all_infores:
+        observed = 0
+        estimate = 0.0
+        variance = 0.0
+        unsampled = 0
+        unknown = 0
+        for stratum, assets in strata.items():
+            population = len(assets)
+            sampled = observations.get(stratum, [])
+            n = len(sampled)
+            unsampled += population - n
+            if n == 0:
+                estimate += population / 2
+                unknown += population
+                continue
+            hits = sum(1 for only_in_ci in sampled if infores in only_in_ci)
+            observed += hits
+            mean = hits / n
+            estimate += population * mean
+            adjusted = (hits + z ** 2 / 2) / (n + z ** 2)
+            variance += population ** 2 * (1 - n / population) * adjusted * (1 - adjusted) / n
+        half_width = z * math.sqrt(variance) + unknown / 2
+        estimates[infores] = {
+            "observed": observed,
+            "estimate": round(estimate, 2),
+            "lower": round(max(observed, estimate - half_width), 2),
+            "upper": round(min(observed + unsampled, estimate + half_width), 2),
+        }
+    return estimates
+
+
+def estimate_unobserved_upper(strata: dict, observations: dict) -> float:
+    """Upper bound on the only-in-CI count of an infores not seen in any sampled asset.
+
+    With zero hits out of n sampled assets, the rule of three bounds the rate at
+    3 / n with about 95% confidence, applied to the assets not sampled yet.
+
+    Args:
+        strata: dict - stratum key to the list of all test assets in it
+        observations: dict - stratum key to a list of only-in-CI infores sets, one per sampled asset
+
+    Returns:
+        the upper bound, in test assets
+    """
+    population = sum(len(assets) for assets in strata.values())
+    n = sum(len(sampled) for sampled in observations.values())
+    if n == 0:
+        return float(population)
+    return round((population - n) * min(1.0, 3 / n), 2)
+
+
+def sample_infores_sources(
+    dev_result_path: str,
+    ci_result_path: str,
+    infores_filter: str = None,
+    batch_size: int = 10,
+    time_budget: float = 300,
+    target_half_width: float = 2,
+    max_unobserved_fraction: float = 0.25,
+    seed: int = None,
+) -> None:
+    """Approximate the infores comparison from a stratified random sample of test assets.
+
+    Each round adds a batch allocated across strata in proportion to their
+    unsampled assets, until every observed infores interval is within the target
+    half width and the bound on infores not seen yet is within the given fraction
+    of the candidates, the time budget runs out, or there is nothing left to sample.
+
+    Args:
+        dev_result_path: str - the local path to an automated test csv output file.
+        ci_result_path: str - the local path to an automated test csv output file.
+        infores_filter: str - optional infores to filter (e.g., 'infores:gtopdb')
+        batch_size: int - number of assets to add per refinement round
+        time_budget: float - seconds to spend fetching and analyzing samples
+        target_half_width: float - stop once every interval half width is at most this many assets
+        max_unobserved_fraction: float - stop once an infores not seen yet is bounded to at most this fraction of the candidates
+        seed: int - optional random seed for a reproducible sample
+    """
+    start = time.monotonic()
+    diff_results = get_diff_results(dev_result_path, ci_result_path)
+    strata = stratify_diff_results(diff_results)
+    population = sum(len(assets) for assets in strata.values())
+    print(f"{len(diff_results.keys())} failed tests, {population} candidates in {len(strata)} strata.")
+
+    rng = random.Random(seed)
+    remaining = {}
+    for stratum, assets in strata.items():
+        remaining[stratum] = list(assets)
+        rng.shuffle(remaining[stratum])
+
+    observations = {}
+    sampled_assets = {}
+    estimates = {}
+    unobserved_upper = population
+    allocation = allocate_samples(remaining, batch_size)
+    converged = False
+    out_of_time = False
+    while allocation and not out_of_time:
+        for stratum, count in allocation.items():
+            for _ in range(count):
+                if time.monotonic() - start > time_budget:
+                    out_of_time = True
+                    break
+                if not remaining[stratum]:
+                    break
+                asset_id = remaining[stratum].pop()
+                result = diff_results[asset_id]
+                print(f"Sampling {asset_id} ({stratum})")
+                only_in_ci = set()
+                if (
+                    get_expected_output(result["ci"]) or
+                    get_test_asset(asset_id)["expected_output"] in TARGET_OUTPUTS
+                ):
+                    ci_pk, dev_pk = get_pks(result)
+                    ci_response, dev_response = load_ars_responses(asset_id, ci_pk, dev_pk)
+                    ci_sources, _ = scan_edges(ci_response, infores_filter)
+                    dev_sources, _ = scan_edges(dev_response, infores_filter)
+                    only_in_ci = ci_sources - dev_sources
+                observations.setdefault(stratum, []).append(only_in_ci)
+                sampled_assets[asset_id] = sorted(list(only_in_ci))
+            if out_of_time:
+                break
+
+        estimates = estimate_only_in_ci_counts(strata, observations)
+        unobserved_upper = estimate_unobserved_upper(strata, observations)
+        widest = max(
+            [(e["upper"] - e["lower"]) / 2 for e in estimates.values()],
+            default=0,
+        )
+        print(
+            f"{len(sampled_assets)}/{population} sampled, widest half width {widest:.2f}, "
+            f"unseen infores at most {unobserved_upper}"
+        )
+        if (
+            widest <= target_half_width and
+            unobserved_upper <= max_unobserved_fraction * population
+        ):
+            converged = True
+            break
+        allocation = allocate_samples(remaining, batch_size)
+
+    sample_report = {
+        "population": population,
+        "sampled": len(sampled_assets),
+        "strata": {stratum: len(assets) for stratum, assets in strata.items()},
+        "converged": converged,
+        "elapsed_seconds": round(time.monotonic() - start, 1),
+        "estimates": estimates,
+        "unobserved_infores_upper": unobserved_upper,
+        "sampled_assets": sampled_assets,
+    }
+
+    output_file = "test_diffs/infores_only_in_ci_sample.json"
+    if infores_filter:
+        output_file = f"test_diffs/infores_only_in_ci_sample_{infores_filter.replace(':', '_')}.json"
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(sample_report, f, indent=2)
+
+    print(f"\nEstimated sources only in CI (not in Dev), 95% confidence:")
+    for source, data in sorted(estimates.items(), key=lambda x: x[1]["estimate"], reverse=True):
+        print(f"  {source}: ~{data['estimate']} test assets [{data['lower']}, {data['upper']}]")
+    print(f"  any other infores: at most {unobserved_upper} test assets")
+
+    print(f"\nSample estimate saved to {output_file}")
@@ -0,0 +1,173 @@
+"""Tests for the edge comparator registry."""
+
+import pytest
+
+from qa_diff.comparators import (
+    COMPARATORS,
+    format_report_row,
+    get_comparators,
+    get_report_columns,
+    register_comparator,
+    scan_edges,
+)
+
+RESPONSE = {
+    "message": {
+        "knowledge_graph": {
+            "edges": {
+                "e1": {
+                    "subject": "CHEBI:28201",
+                    "predicate": "biolink:affects",
+                    "object": "NCBIGene:3043",
+                    "sources": [
+                        {"resource_id": "infores:ctd", "resource_role": "primary_knowledge_source"},
+                        {
+                            "resource_id": "infores:agrkb",
+                            "resource_role": "aggregator_knowledge_source",
+                            "upstream_resource_ids": ["infores:ctd"],
+                        },
+                    ],
+                    "qualifiers": [
+                        {"qualifier_type_id": "biolink:object_direction_qualifier", "qualifier_value": "decreased"},
+                        {"qualifier_type_id": "biolink:object_aspect_qualifier", "qualifier_value": "expression"},
+                        {"qualifier_type_id": "biolink:qualified_predicate", "qualifier_value": "biolink:causes"},
+                    ],
+                    "attributes": [
+                        {"attribute_type_id": "biolink:publications", "value": ["PMID:1", "PMID:2"]},
+                        {"attribute_type_id": "biolink:support_graphs", "value": ["ag1"]},
+                        {"attribute_type_id": "biolink:knowledge_level", "value": "knowledge_assertion"},
+                        {"attribute_type_id": "biolink:agent_type", "value": "manual_agent"},
+                    ],
+                },
+                "e2": {
+                    "subject": "CHEBI:2533",
+                    "predicate": "biolink:related_to",
+                    "object": "NCBIGene:3043",
+                    "sources": [
+                        {"resource_id": "infores:goa", "resource_role": "primary_knowledge_source"},
+                    ],
+                },
+            },
+        },
+    },
+}
+
+# Header and row written by the hard-coded TSV writer this registry replaced.
+OLD_COLUMNS = [
+    "infores",
+    "test_asset",
+    "edge_id",
+    "subject",
+    "predicate",
+    "object",
+    "primary_knowledge_source",
+    "aggregator_knowledge_source",
+    "object_direction_qualifier",
+    "object_aspect_qualifier",
+    "qualified_predicate",
+]
+OLD_ROW = [
+    "infores:ctd",
+    "Asset_391",
+    "e1",
+    "CHEBI:28201",
+    "biolink:affects",
+    "NCBIGene:3043",
+    "infores:ctd",
+    "",
+    "decreased",
+    "expression",
+    "biolink:causes",
+]
+# Detail record written by extract_edge_details before the registry.
+OLD_RECORD = {
+    "edge_id": "e1",
+    "subject": "CHEBI:28201",
+    "predicate": "biolink:affects",
+    "object": "NCBIGene:3043",
+    "primary_knowledge_sources": [
+        {"resource_id": "infores:ctd", "resource_role": "primary_knowledge_source"},
+    ],
+    "aggregator_knowledge_sources": [],
+    "qualifiers": RESPONSE["message"]["knowledge_graph"]["edges"]["e1"]["qualifiers"],
+}
+
+
+def test_default_report_matches_old_format():
+    comparators = get_comparators()
+    sources, edges_by_infores = scan_edges(RESPONSE, comparators=comparators)
+
+    assert sources == {"infores:ctd", "infores:goa"}
+    assert get_report_columns(comparators) == OLD_COLUMNS
+    assert edges_by_infores["infores:ctd"] == [OLD_RECORD]
+    assert format_report_row("infores:ctd", "Asset_391", edges_by_infores["infores:ctd"][0], comparators) == OLD_ROW
+
+
+def test_all_comparators_extend_old_format():
+    comparators = get_comparators(list(COMPARATORS))
+    _, edges_by_infores = scan_edges(RESPONSE, "infores:ctd", comparators)
+
+    assert list(edges_by_infores) == ["infores:ctd"]
+    record = edges_by_infores["infores:ctd"][0]
+    assert record == {
+        **OLD_RECORD,
+        "publications": ["PMID:1", "PMID:2"],
+        "support_graphs": ["ag1"],
+        "knowledge_level": "knowledge_assertion",
+        "agent_type": "manual_agent",
+    }
+    assert get_report_columns(comparators) == OLD_COLUMNS + [
+        "publications",
+        "support_graphs",
+        "knowledge_level",
+        "agent_type",
+    ]
+    assert format_report_row("infores:ctd", "Asset_391", record, comparators) == OLD_ROW + [
+        "PMID:1|PMID:2",
+        "ag1",
+        "knowledge_assertion",
+        "manual_agent",
+    ]
+
+
+def test_attributes_are_indexed_once_per_edge():
+    seen = []
+
+    def make_comparator(name):
+        def extract(fields, infores):
+            seen.append((name, infores, id(fields["attributes"])))
+            return {}
+        return {"fields": ("attributes",), "columns": [], "extract": extract, "format_row": lambda record: []}
+
+    scan_edges(RESPONSE, comparators=[make_comparator("first"), make_comparator("second")])
+
+    assert [(name, infores) for name, infores, _ in seen] == [
+        ("first", "infores:ctd"),
+        ("second", "infores:ctd"),
+        ("first", "infores:goa"),
+        ("second", "infores:goa"),
+    ]
+    assert seen[0][2] == seen[1][2]
+    assert seen[2][2] == seen[3][2]
+
+
+def test_dev_scan_skips_comparators():
+    sources, edges_by_infores = scan_edges(RESPONSE, "infores:goa")
+    assert sources == {"infores:goa"}
+    assert edges_by_infores == {}
+
+
+def test_register_rejects_duplicate_names():
+    sources = COMPARATORS["sources"]
+    with pytest.raises(ValueError):
+        register_comparator("sources", ("sources",), [], sources["extract"], sources["format_row"])
+
+    register_comparator(
+        "sources",
+        sources["fields"],
+        sources["columns"],
+        sources["extract"],
+        sources["format_row"],
+        replace=True,
+    )
+    assert COMPARATORS["sources"]["columns"] == ["primary_knowledge_source", "aggregator_knowledge_source"]
@@ -0,0 +1,126 @@
+"""Tests for the run history store."""
+
+import csv
+
+from qa_diff.history import (
+    diff_runs,
+    first_flip,
+    flaky_assets,
+    get_run_series,
+    infores_timeline,
+    ingest_run,
+    list_runs,
+    load_run,
+    record_infores_summary,
+)
+
+COLUMNS = ["name", "url", "pk", "TestCase", "TestAsset", "ars", "arax"]
+
+
+def write_run(path, statuses, expected_output="TopAnswer"):
+    """Write a test csv output file with an ars status per test asset."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for asset_id, status in statuses.items():
+            writer.writerow([
+                f"{expected_output}: {asset_id}",
+                f"https://example.org/{asset_id}",
+                "https://arax.ci.ncats.io/?r=pk-1",
+                "TestCase_0",
+                asset_id,
+                status,
+                "PASSED",
+            ])
+    return str(path)
+
+
+def test_series_do_not_cross(tmp_path):
+    history_dir = str(tmp_path / "run_history")
+    runs = [
+        ("ci_tests_ 2026_01_01_05_00.csv", {"Asset_1": "PASSED", "Asset_2": "PASSED"}),
+        ("dev_tests_ 2026_01_02_05_00.csv", {"Asset_1": "FAILED", "Asset_2": "PASSED"}),
+        ("ci_tests_ 2026_01_03_05_00.csv", {"Asset_1": "PASSED", "Asset_2": "FAILED"}),
+        ("dev_tests_ 2026_01_04_05_00.csv", {"Asset_1": "FAILED", "Asset_2": "PASSED"}),
+        ("ci_tests_ 2026_01_05_05_00.csv", {"Asset_1": "PASSED", "Asset_2": "PASSED"}),
+    ]
+    for name, statuses in runs:
+        ingest_run(write_run(tmp_path / name, statuses), history_dir)
+
+    assert get_run_series("ci_tests_ 2026_01_01_05_00") == "ci_tests"
+    assert [run["run_id"] for run in list_runs("dev_tests", history_dir)] == [
+        "dev_tests_ 2026_01_02_05_00",
+        "dev_tests_ 2026_01_04_05_00",
+    ]
+    assert len(list_runs(history_dir=history_dir)) == 5
+
+    assert first_flip("Asset_1", "ci_tests", history_dir=history_dir) is None
+    assert first_flip("Asset_1", "dev_tests", history_dir=history_dir) is None
+    assert first_flip("Asset_2", "ci_tests", history_dir=history_dir) == {
+        "run_id": "ci_tests_ 2026_01_03_05_00",
+        "previous_run_id": "ci_tests_ 2026_01_01_05_00",
+        "from": "PASSED",
+        "to": "FAILED",
+    }
+
+    assert list(flaky_assets("ci_tests", history_dir=history_dir)) == ["Asset_2"]
+    assert flaky_assets("dev_tests", min_flips=1, history_dir=history_dir) == {}
+
+
+def test_ingest_is_skipped_when_unchanged(tmp_path):
+    history_dir = str(tmp_path / "run_history")
+    path = write_run(tmp_path / "ci_tests_ 2026_01_01_05_00.csv", {"Asset_1": "PASSED"})
+    ingest_run(path, history_dir)
+    data_size = (tmp_path / "run_history" / "runs.data.jsonl").stat().st_size
+    ingest_run(path, history_dir)
+    assert (tmp_path / "run_history" / "runs.data.jsonl").stat().st_size == data_size
+
+
+def test_diff_runs(tmp_path):
+    history_dir = str(tmp_path / "run_history")
+    dev_run_id = ingest_run(write_run(
+        tmp_path / "dev_tests_ 2026_01_02_05_00.csv",
+        {"Asset_1": "FAILED", "Asset_2": "PASSED", "Asset_3": "No results"},
+    ), history_dir)
+    ci_run_id = ingest_run(write_run(
+        tmp_path / "ci_tests_ 2026_01_01_05_00.csv",
+        {"Asset_1": "PASSED", "Asset_2": "PASSED", "Asset_3": "FAILED"},
+    ), history_dir)
+
+    diff_results = diff_runs(dev_run_id, ci_run_id, history_dir=history_dir)
+    assert list(diff_results) == ["Asset_1"]
+    assert list(diff_results["Asset_1"]["ci"].items()) == [
+        ("name", "TopAnswer: Asset_1"),
+        ("url", "https://example.org/Asset_1"),
+        ("pk", "https://arax.ci.ncats.io/?r=pk-1"),
+        ("TestCase", "TestCase_0"),
+        ("TestAsset", "Asset_1"),
+        ("ars", "PASSED"),
+        ("arax", "PASSED"),
+    ]
+    assert diff_results["Asset_1"]["dev"]["ars"] == "FAILED"
+
+
+def test_runs_keep_their_own_names(tmp_path):
+    history_dir = str(tmp_path / "run_history")
+    old_run_id = ingest_run(write_run(
+        tmp_path / "ci_tests_ 2026_01_01_05_00.csv", {"Asset_1": "PASSED"}, "NeverShow",
+    ), history_dir)
+    new_run_id = ingest_run(write_run(
+        tmp_path / "ci_tests_ 2026_01_02_05_00.csv", {"Asset_1": "PASSED"}, "TopAnswer",
+    ), history_dir)
+
+    assert load_run(old_run_id, history_dir)["Asset_1"]["name"] == "NeverShow: Asset_1"
+    assert load_run(new_run_id, history_dir)["Asset_1"]["name"] == "TopAnswer: Asset_1"
+
+
+def test_infores_timeline_replaces_covered_sources(tmp_path):
+    history_dir = str(tmp_path / "run_history")
+    ctd = {"count": 2, "test_assets": ["Asset_1", "Asset_2"]}
+    goa = {"count": 1, "test_assets": ["Asset_1"]}
+    record_infores_summary("dev", "ci", {"infores:ctd": ctd, "infores:goa": goa}, history_dir=history_dir)
+    record_infores_summary("dev", "ci", {}, "infores:ctd", history_dir)
+    assert list(infores_timeline(history_dir=history_dir)) == ["infores:goa"]
+
+    record_infores_summary("dev", "ci", {"infores:ctd": ctd}, history_dir=history_dir)
+    assert list(infores_timeline(history_dir=history_dir)) == ["infores:ctd"]
@@ -0,0 +1,100 @@
+"""Tests for stratified sampling of test assets."""
+
+import json
+import random
+
+import qa_diff.sampling
+from qa_diff.sampling import (
+    allocate_samples,
+    estimate_only_in_ci_counts,
+    estimate_unobserved_upper,
+    sample_infores_sources,
+    stratify_diff_results,
+)
+
+
+def make_result(name, test_case):
+    """Make a diff result with the CI row fields stratification reads."""
+    return {"ci": {"name": name, "TestCase": test_case}, "dev": {}}
+
+
+def test_stratify_pools_small_test_cases():
+    diff_results = {
+        "Asset_1": make_result("NeverShow: a", "TestCase_0"),
+        "Asset_2": make_result("TopAnswer: b", "TestCase_1"),
+        "Asset_3": make_result("TopAnswer: c", "TestCase_2"),
+        "Asset_4": make_result("Acceptable: d", "TestCase_2"),
+        "Asset_5": make_result("e", "TestCase_3"),
+    }
+    for asset_id in ("Asset_6", "Asset_7"):
+        diff_results[asset_id] = make_result("TopAnswer: f", "TestCase_4")
+
+    strata = stratify_diff_results(diff_results, min_stratum_size=2)
+    assert strata == {
+        "TopAnswer|pooled": ["Asset_2", "Asset_3"],
+        "Acceptable|pooled": ["Asset_4"],
+        "Unknown|pooled": ["Asset_5"],
+        "TopAnswer|TestCase_4": ["Asset_6", "Asset_7"],
+    }
+
+
+def test_allocation_sums_to_batch_and_respects_caps():
+    remaining = {"a": list(range(3)), "b": list(range(10)), "c": [], "d": list(range(1))}
+    for batch_size in range(1, 20):
+        allocation = allocate_samples(remaining, batch_size)
+        assert sum(allocation.values()) == min(batch_size, 14)
+        for stratum, count in allocation.items():
+            assert 0 < count <= len(remaining[stratum])
+    assert allocate_samples({"a": []}, 5) == {}
+
+
+def test_intervals_cover_known_total():
+    rng = random.Random(0)
+    strata = {"a": list(range(40)), "b": list(range(60))}
+    hits = {"a": set(rng.sample(range(40), 10)), "b": set(rng.sample(range(60), 45))}
+    total = len(hits["a"]) + len(hits["b"])
+
+    covered = 0
+    for seed in range(100):
+        sample_rng = random.Random(seed)
+        observations = {
+            stratum: [
+                {"infores:ctd"} if asset in hits[stratum] else set()
+                for asset in sample_rng.sample(assets, 10)
+            ]
+            for stratum, assets in strata.items()
+        }
+        estimate = estimate_only_in_ci_counts(strata, observations)["infores:ctd"]
+        if estimate["lower"] <= total <= estimate["upper"]:
+            covered += 1
+    assert covered >= 90
+
+
+def test_all_hits_are_not_a_zero_width_interval():
+    strata = {"a": list(range(100))}
+    observations = {"a": [{"infores:ctd"}] * 4}
+    estimate = estimate_only_in_ci_counts(strata, observations)["infores:ctd"]
+    assert estimate["upper"] == 100
+    assert estimate["lower"] < 80
+
+
+def test_unobserved_upper_shrinks_with_pooled_samples():
+    strata = {"a": list(range(50)), "b": list(range(50))}
+    assert estimate_unobserved_upper(strata, {}) == 100
+    observations = {"a": [set()] * 10, "b": [set()] * 10}
+    assert estimate_unobserved_upper(strata, observations) == 12
+
+
+def test_empty_diff_gives_empty_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "test_diffs").mkdir()
+    monkeypatch.setattr(qa_diff.sampling, "get_diff_results", lambda dev, ci: {})
+
+    sample_infores_sources("dev.csv", "ci.csv", seed=0)
+
+    with open(tmp_path / "test_diffs" / "infores_only_in_ci_sample.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["population"] == 0
+    assert report["sampled"] == 0
+    assert report["estimates"] == {}
+    assert report["sampled_assets"] == {}